@@ -1,19 +1,67 @@
 import sys
 import time
+
+START_TIME = time.perf_counter()
+
 import os
-import polib
 import pickle
 import re
 import configparser
+import argparse
+import threading
+import heapq
+import itertools
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QFileDialog, QTableWidget,
                              QTableWidgetItem, QSplitter, QLabel, QTextEdit,
                              QHeaderView, QInputDialog, QMessageBox, QDialog,
                              QPlainTextEdit, QLineEdit)
-from PyQt6.QtCore import Qt, pyqtSignal, QThread
+from PyQt6.QtCore import Qt, pyqtSignal, QThread, QTimer, QFileSystemWatcher
 from PyQt6.QtGui import QColor
 
 import api_request
+import catalog
+import prefilter
+
+# API Key 验证有效期 (秒)，过期后重新验证
+API_KEY_TTL = 7 * 24 * 3600
+# 监视模式防抖 (毫秒)，等待游戏更新写完文件
+WATCH_DEBOUNCE_MS = 2000
+# 滚动后更新翻译优先级的防抖 (毫秒)
+PRIORITY_DEBOUNCE_MS = 150
+
+# 翻译优先级，数值越小越先翻译
+PRIORITY_SELECTED = 0
+PRIORITY_VIEWPORT = 1
+PRIORITY_SEARCH = 2
+PRIORITY_DEFAULT = 3
+
+# 审阅建议：选中行后的防抖 (毫秒) 和额外预取的后续行数
+SUGGEST_DEBOUNCE_MS = 300
+SUGGEST_PREFETCH = 3
+
+
+def get_base_path():
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def read_api_key(config_path):
+    """
+    读取已保存的 API Key
+    :return: (key, validated_at)
+    """
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    if 'Settings' in config and 'GeminiKey' in config['Settings']:
+        try:
+            validated_at = config['Settings'].getfloat('ValidatedAt', 0.0)
+        except ValueError:
+            # 时间戳损坏时视为未验证
+            validated_at = 0.0
+        return config['Settings']['GeminiKey'].strip(), validated_at
+    return "", 0.0
 
 
 # 日志窗口
@@ -73,73 +121,195 @@ class TranslatorWorker(QThread):
     finished = pyqtSignal(int, str, dict)
     log_signal = pyqtSignal(str)
 
-    def __init__(self, data_rows, api_key):
+    def __init__(self, data_rows, api_key, indices=None):
         super().__init__()
         self.data_rows = data_rows
         self.api_key = api_key
+        self.lock = threading.Lock()
+        # 优先队列 (priority, seq, idx)，过期条目在出队时跳过
+        self.heap = []
+        self.seq = itertools.count()
+        # 待翻译行 idx -> 当前优先级
+        self.priority = {}
+        # 各优先级当前包含的行，重新设置时旧行降回默认
+        self.levels = {PRIORITY_SELECTED: set(), PRIORITY_VIEWPORT: set(), PRIORITY_SEARCH: set()}
+        # 选中行的请求时间，用于统计等待时长
+        self.requested_at = {}
+        self.start_time = 0.0
+        self.first_result = True
+        # 尚未经过本地预筛的行，以及占位符校验失败的重试次数
+        self.unfiltered = []
+        self.retries = {}
+        # 队列已取空、线程即将退出，之后追加的行不会再被处理
+        self.drained = False
+
+        # 待翻译行索引，默认按文件顺序遍历全部
+        if indices is None:
+            indices = range(len(data_rows))
+        self.enqueue(indices)
+
+    def _push(self, idx, level):
+        self.priority[idx] = level
+        heapq.heappush(self.heap, (level, next(self.seq), idx))
+
+    def _effective_level(self, idx):
+        for level in (PRIORITY_SELECTED, PRIORITY_VIEWPORT, PRIORITY_SEARCH):
+            if idx in self.levels[level]:
+                return level
+        return PRIORITY_DEFAULT
+
+    def enqueue(self, indices):
+        """
+        运行中追加待翻译行 (监视模式)
+        :return: 线程已取空队列时返回 False，调用方需要启动新的线程
+        """
+        with self.lock:
+            if self.drained:
+                return False
+            for idx in indices:
+                if idx not in self.priority:
+                    self._push(idx, self._effective_level(idx))
+                    self.unfiltered.append(idx)
+            return True
+
+    def set_priority(self, level, indices):
+        """
+        设置某一优先级包含的行 (选中 / 可见区域 / 搜索结果)，可在运行中调用
+        :param level: PRIORITY_SELECTED / PRIORITY_VIEWPORT / PRIORITY_SEARCH
+        :param indices: 行索引
+        """
+        indices = set(indices)
+        with self.lock:
+            old = self.levels[level]
+            self.levels[level] = indices
+            if level == PRIORITY_SELECTED:
+                # 已在等待的行保留最初的请求时间
+                now = time.perf_counter()
+                self.requested_at = {idx: self.requested_at.get(idx, now)
+                                     for idx in indices if idx in self.priority}
+
+            for idx in old | indices:
+                if idx not in self.priority:
+                    continue
+                new_level = self._effective_level(idx)
+                if new_level != self.priority[idx]:
+                    self._push(idx, new_level)
+
+    def is_pending(self, idx):
+        with self.lock:
+            return idx in self.priority
+
+    def next_index(self):
+        with self.lock:
+            while self.heap:
+                level, _, idx = heapq.heappop(self.heap)
+                if self.priority.get(idx) == level:
+                    del self.priority[idx]
+                    return idx
+            self.drained = True
+            return None
+
+    def emit_result(self, i, trans_str, trans_dict):
+        self.finished.emit(i, trans_str, trans_dict)
+
+        # 统计首个可审阅结果 (本地预筛或 API) 和选中行的等待时长
+        now = time.perf_counter()
+        if self.first_result:
+            self.first_result = False
+            self.log_signal.emit(f"First Result Latency: {(now - self.start_time) * 1000:.0f} ms")
+        with self.lock:
+            requested = self.requested_at.pop(i, None)
+        if requested is not None:
+            entry_id = self.data_rows[i]['entry_id']
+            self.log_signal.emit(f"Selected Row Latency [{entry_id}]: {(now - requested) * 1000:.0f} ms")
+
+    def prefilter_pending(self):
+        # 本地预筛，无需翻译的条目直接出结果，不再请求 API
+        with self.lock:
+            batch, self.unfiltered = self.unfiltered, []
+
+        t0 = time.perf_counter()
+        resolved = catalog.resolve_local(self.data_rows, batch)
+        with self.lock:
+            for idx, _, _ in resolved:
+                self.priority.pop(idx, None)
+
+        for idx, trans_str, trans_dict in resolved:
+            self.emit_result(idx, trans_str, trans_dict)
+        self.log_signal.emit(f"Prefilter: {len(resolved)}/{len(batch)} entries resolved locally "
+                             f"in {(time.perf_counter() - t0) * 1000:.0f} ms")
 
     def run(self):
         self.log_signal.emit(">>> Translation Started...")
+        self.start_time = time.perf_counter()
 
-        for i, row in enumerate(self.data_rows):
-            if self.isInterruptionRequested():
-                break
+        while not self.isInterruptionRequested():
+            if self.unfiltered:
+                self.prefilter_pending()
 
-            current_trans_str = row['translated_text']
-            current_trans_dict = row['translated_plural']
-            has_trans = current_trans_str or current_trans_dict
+            i = self.next_index()
+            if i is None:
+                break
 
-            # 翻译逻辑：New且空，或者 Modified
-            should_translate = (row['status'] == 'New' and not has_trans) or (row['status'] == 'Modified')
+            row = self.data_rows[i]
+            if catalog.should_translate(row):
+                text = catalog.source_text(row)
+                ai_result = catalog.ai_translate(text, self.api_key, self.log_signal.emit)
+
+                # 占位符校验失败的行重新排队，不阻塞其他行
+                if not catalog.check_ai_result(text, ai_result):
+                    self.retries[i] = self.retries.get(i, 0) + 1
+                    if self.retries[i] <= catalog.PLACEHOLDER_RETRIES:
+                        self.log_signal.emit(f"Placeholder mismatch [{row['entry_id']}], re-queued: {ai_result}")
+                        with self.lock:
+                            self._push(i, self._effective_level(i))
+                        continue
+                    ai_result = f"[Placeholder Error] {ai_result}"
+
+                trans_str, trans_dict = catalog.merge_ai_result(row, ai_result)
+                if row['is_plural']:
+                    self.log_signal.emit(f"Translation (Plural) [{row['entry_id']}]: Append/Set -> {trans_dict[0]}")
+                else:
+                    self.log_signal.emit(f"Translation (Singular) [{row['entry_id']}]: Append/Set -> {trans_str}")
 
-            if should_translate:
-                original_text = row.get('new_ru_text', '')
-                if not original_text: original_text = row['msgid']
+                self.emit_result(i, trans_str, trans_dict)
 
-                trans_str = ""
-                trans_dict = {}
+        with self.lock:
+            self.drained = True
+        self.log_signal.emit(">>> Translation Completed.")
 
-                try:
-                    raw_result = api_request.translate_with_gemini(original_text, self.api_key)
-                    if "Error" in raw_result:
-                        ai_result = raw_result
-                    else:
-                        ai_result = f"[AI] {raw_result}"
-                    time.sleep(1.0)
 
-                except Exception as e:
-                    ai_result = f"Error: {str(e)}"
-                    self.log_signal.emit(f"API Error: {str(e)}")
+# 审阅建议预取
+class SuggestionWorker(QThread):
+    suggestion_ready = pyqtSignal(int, str)
+    log_signal = pyqtSignal(str)
 
-                # 复数逻辑
-                if row['is_plural']:
-                    old_text = current_trans_dict.get(0, "")
-                    if row['status'] == 'Modified' and old_text:
-                        if ai_result not in old_text:
-                            final_text = f"{old_text}\n{ai_result}"
-                        else:
-                            final_text = old_text
-                    else:
-                        final_text = ai_result
-                    trans_dict = {0: final_text}
-                    self.log_signal.emit(f"Translation (Plural) [{row['entry_id']}]: Append/Set -> {final_text}")
+    def __init__(self, jobs, api_key, parent=None):
+        """
+        :param jobs: [(idx, 原文), ...]，第一个为当前选中行
+        :param api_key: API Key
+        :param parent: 父对象，线程结束前由其持有，避免被提前销毁
+        """
+        super().__init__(parent)
+        self.jobs = jobs
+        self.api_key = api_key
 
-                # 单数逻辑
-                else:
-                    old_text = current_trans_str
-                    if row['status'] == 'Modified' and old_text:
-                        if ai_result not in old_text:
-                            final_text = f"{old_text}\n{ai_result}"
-                        else:
-                            final_text = old_text
-                    else:
-                        final_text = ai_result
-                    trans_str = final_text
-                    self.log_signal.emit(f"Translation (Singular) [{row['entry_id']}]: Append/Set -> {trans_str}")
+    def run(self):
+        texts = [text for _, text in self.jobs]
+        for (idx, text), reason in zip(self.jobs, prefilter.classify_batch(texts)):
+            # 被新的选中请求取代时停止
+            if self.isInterruptionRequested():
+                break
 
-                self.finished.emit(i, trans_str, trans_dict)
+            if reason is not None:
+                self.suggestion_ready.emit(idx, text)
+                continue
 
-        self.log_signal.emit(">>> Translation Completed.")
+            ai_result = catalog.ai_translate_checked(text, self.api_key, self.log_signal.emit)
+            if catalog.is_error_result(ai_result):
+                self.log_signal.emit(f"Suggestion Error: {ai_result}")
+                continue
+            self.suggestion_ready.emit(idx, catalog.strip_ai_mark(ai_result))
 
 
 # 最终确认窗口
@@ -197,22 +367,49 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Poedit Copilot v0.1.0")
 
-        if getattr(sys, 'frozen', False):
-            base_path = os.path.dirname(sys.executable)
-        else:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-
-        self.config_path = os.path.join(base_path, 'PoeditCopilot.ini')
+        self.config_path = os.path.join(get_base_path(), 'PoeditCopilot.ini')
 
         self.po_entries = []
         self.old_ru_map = {}
         self.old_cn_map = {}
-
-        self.log_window = LogWindow()
-        self.log_window.show()
+        self.display_rows = {}
+
+        # 审阅建议 idx -> 译文
+        self.suggestions = {}
+        self.suggest_workers = []
+        self.suggest_timer = QTimer(self)
+        self.suggest_timer.setSingleShot(True)
+        self.suggest_timer.setInterval(SUGGEST_DEBOUNCE_MS)
+        self.suggest_timer.timeout.connect(self.request_suggestions)
+
+        # 监视模式
+        self.worker = None
+        self.new_ru_path = ""
+        self.watch_api_key = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_watch_changed)
+        self.watcher.fileChanged.connect(self.on_watch_changed)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self.watch_timer.timeout.connect(self.on_watch_rediff)
+
+        # 日志窗口延迟到事件循环启动后创建，之前的日志先缓存
+        self.log_window = None
+        self.log_buffer = []
+        QTimer.singleShot(0, self.show_log_window)
 
         self.init_ui()
 
+    def show_log_window(self):
+        if self.log_window is None:
+            self.log_window = LogWindow()
+            for msg in self.log_buffer:
+                self.log_window.log(msg)
+            self.log_buffer = []
+        self.log_window.show()
+        self.log(f"Startup Completed: {(time.perf_counter() - START_TIME) * 1000:.0f} ms")
+
     def init_ui(self):
         main_widget = QWidget()
         layout = QVBoxLayout()
@@ -237,16 +434,28 @@ class MainWindow(QMainWindow):
         self.btn_temp_save = QPushButton("Save Project")
         self.btn_temp_load = QPushButton("Load Project")
         self.btn_final = QPushButton("Review and Export")
+        self.btn_watch = QPushButton("Watch")
+        self.btn_watch.setCheckable(True)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search...")
 
         self.btn_auto_trans.clicked.connect(self.start_ai_trans)
         self.btn_temp_save.clicked.connect(self.save_progress)
         self.btn_temp_load.clicked.connect(self.load_progress)
         self.btn_final.clicked.connect(self.show_final_dialog)
+        self.btn_watch.toggled.connect(self.toggle_watch)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(PRIORITY_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.refresh_ui)
+        self.search_edit.textChanged.connect(lambda _: self.search_timer.start())
 
         func_group.addWidget(self.btn_auto_trans)
         func_group.addWidget(self.btn_temp_save)
         func_group.addWidget(self.btn_temp_load)
         func_group.addWidget(self.btn_final)
+        func_group.addWidget(self.btn_watch)
+        func_group.addWidget(self.search_edit)
 
         # 3. 主表格区域
         splitter = QSplitter(Qt.Orientation.Horizontal)
@@ -275,6 +484,13 @@ class MainWindow(QMainWindow):
         left_v_bar.valueChanged.connect(right_v_bar.setValue)
         right_v_bar.valueChanged.connect(left_v_bar.setValue)
 
+        # 滚动后更新可见区域的翻译优先级
+        self.priority_timer = QTimer(self)
+        self.priority_timer.setSingleShot(True)
+        self.priority_timer.setInterval(PRIORITY_DEBOUNCE_MS)
+        self.priority_timer.timeout.connect(self.update_priority)
+        left_v_bar.valueChanged.connect(lambda _: self.priority_timer.start())
+
         splitter.setSizes([768, 768])
 
         # 4. 底部编辑栏
@@ -294,10 +510,19 @@ class MainWindow(QMainWindow):
         edit_group.addWidget(self.btn_accept)
         edit_group.addWidget(self.btn_edit)
 
+        # 5. 审阅建议栏
+        suggest_group = QHBoxLayout()
+        self.lbl_suggest = QLabel("Suggestion: -")
+        self.lbl_suggest.setWordWrap(True)
+        self.lbl_suggest.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.lbl_suggest.setStyleSheet("color: #555;")
+        suggest_group.addWidget(self.lbl_suggest, 1)
+
         layout.addLayout(top_group)
         layout.addLayout(func_group)
         layout.addWidget(splitter, 1)
         layout.addLayout(edit_group)
+        layout.addLayout(suggest_group)
 
         main_widget.setLayout(layout)
         self.setCentralWidget(main_widget)
@@ -313,25 +538,112 @@ class MainWindow(QMainWindow):
             self.log("Translation cancelled: No valid API Key.")
             return
 
-        self.worker = TranslatorWorker(self.po_entries, api_key)
+        self.run_worker(api_key)
+
+    def run_worker(self, api_key, indices=None):
+        self.worker = TranslatorWorker(self.po_entries, api_key, indices)
         self.worker.log_signal.connect(self.log)
         self.worker.finished.connect(self.on_ai_finished)
         self.worker.start()
+        if self.current_idx >= 0:
+            self.worker.set_priority(PRIORITY_SELECTED, [self.current_idx])
+        self.update_priority()
+
+    def toggle_watch(self, checked):
+        if not checked:
+            paths = self.watcher.files() + self.watcher.directories()
+            if paths:
+                self.watcher.removePaths(paths)
+            self.watch_timer.stop()
+            self.log("Watch Mode Stopped.")
+            return
+
+        if not self.po_entries:
+            QMessageBox.warning(self, "Watch Mode", "Please load the NEW Original MO or a project first.")
+            self.btn_watch.setChecked(False)
+            return
+
+        if not self.new_ru_path:
+            # 从项目文件恢复时没有原文路径
+            path, _ = QFileDialog.getOpenFileName(self, "Choose NEW Original MO to Watch", "", "MO Files (*.mo)")
+            if not path:
+                self.btn_watch.setChecked(False)
+                return
+            self.new_ru_path = path
+            self.watch_timer.start()
+
+        self.watch_api_key = self.get_valid_api_key()
+        if not self.watch_api_key:
+            self.log("Watch Mode: No valid API Key, changed entries will not be translated.")
+
+        # 监视所在目录 (游戏更新常以替换文件方式写入) 以及文件本身
+        self.watcher.addPath(os.path.dirname(self.new_ru_path))
+        self.watcher.addPath(self.new_ru_path)
+        self.log(f"Watch Mode Started: {self.new_ru_path}")
+
+    def stop_watch(self):
+        # 换文件或项目时停止监视 (通过按钮状态触发 toggle_watch)
+        if self.btn_watch.isChecked():
+            self.btn_watch.setChecked(False)
+
+    def on_watch_changed(self, path):
+        self.watch_timer.start()
+
+    def on_watch_rediff(self):
+        if not os.path.exists(self.new_ru_path):
+            return
+        # 文件被替换后需要重新加入监视
+        if self.new_ru_path not in self.watcher.files():
+            self.watcher.addPath(self.new_ru_path)
+
+        try:
+            t0 = time.perf_counter()
+            changed = catalog.rediff(self.po_entries, self.new_ru_path)
+        except Exception as e:
+            self.log(f"Watch Error: {e}")
+            return
+
+        if not changed:
+            return
+
+        for idx in changed:
+            self.suggestions.pop(idx, None)
+
+        self.log(f"Watch Mode: {len(changed)} entries changed, re-diffed in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        self.refresh_ui()
+
+        if not self.watch_api_key:
+            return
+        # 线程可能刚取空队列正在退出，此时追加失败，改为启动新线程
+        running = self.worker is not None and self.worker.isRunning()
+        if not running or not self.worker.enqueue(changed):
+            self.run_worker(self.watch_api_key, changed)
 
     def get_valid_api_key(self):
-        config = configparser.ConfigParser()
         current_key = ""
+        validated_at = 0.0
 
         if os.path.exists(self.config_path):
             try:
-                config.read(self.config_path)
-                if 'Settings' in config and 'GeminiKey' in config['Settings']:
-                    current_key = config['Settings']['GeminiKey'].strip()
+                current_key, validated_at = read_api_key(self.config_path)
             except Exception as e:
                 self.log(f"Config read error: {e}")
 
         if current_key:
-            return current_key
+            # 验证结果未过期，直接使用
+            if time.time() - validated_at < API_KEY_TTL:
+                return current_key
+
+            self.log("Re-verifying saved API Key...")
+            is_valid, msg = api_request.validate_api_key(current_key)
+            if is_valid:
+                self.save_api_key(current_key)
+                return current_key
+            if is_valid is None:
+                # 网络等临时错误不判定 Key 无效，继续使用且不更新验证时间
+                self.log(f"Could not re-verify saved API Key, keep using it: {msg}")
+                return current_key
+            self.log(f"Saved API Key is invalid: {msg}")
 
         while True:
             text, ok = QInputDialog.getText(self, "API Key Missing",
@@ -351,12 +663,23 @@ class MainWindow(QMainWindow):
                 self.save_api_key(input_key)
                 self.log("API Key has verified and saved.")
                 return input_key
+            elif is_valid is None:
+                QMessageBox.warning(self, "Verification Failed", f"Could not verify API Key.\nServer response: {msg}")
             else:
                 QMessageBox.warning(self, "Verification Failed", f"Invalid API Key.\nServer response: {msg}")
 
     def save_api_key(self, key):
         config = configparser.ConfigParser()
-        config['Settings'] = {'GeminiKey': key}
+        if os.path.exists(self.config_path):
+            try:
+                config.read(self.config_path)
+            except Exception as e:
+                self.log(f"Config read error: {e}")
+
+        if 'Settings' not in config:
+            config['Settings'] = {}
+        config['Settings']['GeminiKey'] = key
+        config['Settings']['ValidatedAt'] = str(time.time())
         try:
             with open(self.config_path, 'w') as f:
                 config.write(f)
@@ -365,7 +688,10 @@ class MainWindow(QMainWindow):
 
     # 逻辑处理
     def log(self, msg):
-        self.log_window.log(msg)
+        if self.log_window is None:
+            self.log_buffer.append(msg)
+        else:
+            self.log_window.log(msg)
         print(msg)
 
     def load_new_ru(self):
@@ -373,31 +699,11 @@ class MainWindow(QMainWindow):
         if not path: return
 
         try:
-            mo = polib.mofile(path)
-            self.po_entries = []
-
-            for idx, entry in enumerate(mo):
-                # 检测是否为复数
-                is_plural = bool(entry.msgid_plural)
-
-                if is_plural:
-                    # 如果是复数，msgstr 为空，需要从 msgstr_plural 字典获取索引 0
-                    new_ru_text = entry.msgstr_plural.get(0, "")
-                else:
-                    # 单数直接取 msgstr
-                    new_ru_text = entry.msgstr
-
-                self.po_entries.append({
-                    'entry_id': idx + 1,
-                    'msgid': entry.msgid,
-                    'is_plural': is_plural,
-                    'msgid_plural': entry.msgid_plural if is_plural else '',
-                    'new_ru_text': new_ru_text,
-                    'old_ru_text': '',
-                    'status': 'New',
-                    'translated_text': '',
-                    'translated_plural': {}
-                })
+            self.po_entries = catalog.load_new(path)
+            if path != self.new_ru_path:
+                self.stop_watch()
+            self.new_ru_path = path
+            self.suggestions = {}
 
             self.log(f"Load NEW File Completed: {len(self.po_entries)}")
             self.refresh_ui()
@@ -410,53 +716,7 @@ class MainWindow(QMainWindow):
         if not path: return
 
         try:
-            old_mo = polib.mofile(path)
-            # 建立旧版映射，映射整个 Entry 对象以检查复数ID
-            old_map = {e.msgid: e for e in old_mo}
-
-            new_ids = set()
-
-            for item in self.po_entries:
-                mid = item['msgid']
-                new_ids.add(mid)
-
-                if mid in old_map:
-                    old_entry = old_map[mid]
-                    if item['is_plural']:
-                        item['old_ru_text'] = old_entry.msgstr_plural.get(0, "")
-                    else:
-                        item['old_ru_text'] = old_entry.msgstr
-
-                    # 检查 msgid_plural 是否变更
-                    plural_changed = False
-                    if item['is_plural']:
-                        if old_entry.msgid_plural != item['msgid_plural']:
-                            plural_changed = True
-
-                    # 检查 msgstr 是否变更
-                    text_changed = (item['new_ru_text'] != item['old_ru_text'])
-
-                    if text_changed or plural_changed:
-                        item['status'] = 'Modified'
-                    else:
-                        item['status'] = 'Normal'
-                else:
-                    item['status'] = 'New'
-
-            # 处理删除
-            for entry in old_mo:
-                if entry.msgid not in new_ids:
-                    self.po_entries.append({
-                        'entry_id': -1,
-                        'msgid': entry.msgid,
-                        'is_plural': bool(entry.msgid_plural),
-                        'msgid_plural': entry.msgid_plural,
-                        'new_ru_text': '',
-                        'old_ru_text': entry.msgstr,
-                        'status': 'Deleted',
-                        'translated_text': '',
-                        'translated_plural': {}
-                    })
+            catalog.compare_old(self.po_entries, path)
 
             self.log("Compared Completed.")
             self.refresh_ui()
@@ -470,27 +730,7 @@ class MainWindow(QMainWindow):
         if not path: return
 
         try:
-            cn_mo = polib.mofile(path)
-            # 建立映射 msgid -> Entry对象
-            cn_map = {e.msgid: e for e in cn_mo}
-
-            count = 0
-            for item in self.po_entries:
-                if item['msgid'] in cn_map:
-                    target_entry = cn_map[item['msgid']]
-
-                    if item['is_plural']:
-                        # 如果当前是复数，尝试获取目标文件的复数翻译
-                        if target_entry.msgstr_plural:
-                            item['translated_plural'] = target_entry.msgstr_plural.copy()
-                        # 兼容性处理
-                        elif target_entry.msgstr:
-                            item['translated_plural'] = {0: target_entry.msgstr}
-                    else:
-                        # 单数
-                        item['translated_text'] = target_entry.msgstr
-
-                    count += 1
+            count = catalog.load_translations(self.po_entries, path)
 
             self.log(f"Translation Loaded. {count} Paired.")
             self.refresh_ui()
@@ -498,29 +738,34 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.log(f"Error: {e}")
 
+    def match_search(self, item):
+        keyword = self.search_edit.text().strip().lower()
+        if not keyword:
+            return True
+        return (keyword in item['msgid'].lower() or keyword in item['new_ru_text'].lower()
+                or keyword in self._trans_display(item).lower())
+
     def refresh_ui(self):
+        # 保留滚动位置，避免刷新后跳回顶部
+        scroll_value = self.left_table.verticalScrollBar().value()
         self.left_table.setRowCount(0)
         self.right_table.setRowCount(0)
 
         display_list = []
         for idx, item in enumerate(self.po_entries):
             if item['status'] == 'Normal': continue
+            if not self.match_search(item): continue
             display_list.append((idx, item))
 
+        # 数据行索引 -> 表格行号
+        self.display_rows = {real_idx: row for row, (real_idx, _) in enumerate(display_list)}
+
         self.left_table.setRowCount(len(display_list))
         self.right_table.setRowCount(len(display_list))
 
         for row, (real_idx, item) in enumerate(display_list):
             st = item['status']
-            color = QColor(255, 255, 255)
-            if st == 'New':
-                color = QColor(200, 255, 200)
-            elif st == 'Modified':
-                color = QColor(255, 255, 200)
-            elif st == 'Deleted':
-                color = QColor(255, 200, 200)
-            elif st == 'Saved':
-                color = QColor(200, 200, 255)
+            color = self._status_color(st)
 
             # 左表
             # ID，标记复数
@@ -536,16 +781,58 @@ class MainWindow(QMainWindow):
             self._set_item(self.right_table, row, 0, st, color, real_idx)
 
             # 翻译列，如果是复数，显示字典摘要
-            if item['is_plural']:
-                trans_txt = "; ".join([f"[{k}]{v}" for k, v in item['translated_plural'].items()])
-            else:
-                trans_txt = item['translated_text']
-
-            self._set_item(self.right_table, row, 1, trans_txt, color, real_idx)
+            self._set_item(self.right_table, row, 1, self._trans_display(item), color, real_idx)
 
             act_txt = "TBD" if st in ['New', 'Modified'] else ""
             self._set_item(self.right_table, row, 2, act_txt, color, real_idx)
 
+        self.left_table.verticalScrollBar().setValue(scroll_value)
+        self.update_priority()
+
+    def _status_color(self, st):
+        color = QColor(255, 255, 255)
+        if st == 'New':
+            color = QColor(200, 255, 200)
+        elif st == 'Modified':
+            color = QColor(255, 255, 200)
+        elif st == 'Deleted':
+            color = QColor(255, 200, 200)
+        elif st == 'Saved':
+            color = QColor(200, 200, 255)
+        return color
+
+    def _trans_display(self, item):
+        if item['is_plural']:
+            return "; ".join([f"[{k}]{v}" for k, v in item['translated_plural'].items()])
+        return item['translated_text']
+
+    def visible_indices(self):
+        # 左右表同步滚动，取左表可见区域
+        table = self.left_table
+        first = table.rowAt(0)
+        if first < 0:
+            return []
+        last = table.rowAt(table.viewport().height() - 1)
+        if last < 0:
+            last = table.rowCount() - 1
+
+        result = []
+        for row in range(first, last + 1):
+            item = table.item(row, 0)
+            if item is not None:
+                result.append(item.data(Qt.ItemDataRole.UserRole))
+        return result
+
+    def update_priority(self):
+        # 可见行和搜索结果优先翻译
+        if self.worker is None or not self.worker.isRunning():
+            return
+        self.worker.set_priority(PRIORITY_VIEWPORT, self.visible_indices())
+        if self.search_edit.text().strip():
+            self.worker.set_priority(PRIORITY_SEARCH, self.display_rows.keys())
+        else:
+            self.worker.set_priority(PRIORITY_SEARCH, [])
+
     def _set_item(self, table, row, col, text, color, user_data):
         item = QTableWidgetItem(str(text))
         item.setData(Qt.ItemDataRole.UserRole, user_data)
@@ -557,6 +844,9 @@ class MainWindow(QMainWindow):
         if idx is None: return
         self.current_idx = idx
 
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.set_priority(PRIORITY_SELECTED, [idx])
+
         entry = self.po_entries[idx]
         if entry['is_plural']:
             source_show = f"[Plural ID] {entry['msgid_plural']}\n[Singular Source] {entry['new_ru_text']}"
@@ -570,6 +860,86 @@ class MainWindow(QMainWindow):
         self.btn_accept.setEnabled(not is_del)
         self.btn_edit.setEnabled(not is_del)
 
+        self.show_suggestion()
+        self.suggest_timer.start()
+
+    def show_suggestion(self):
+        if self.current_idx < 0: return
+        entry = self.po_entries[self.current_idx]
+        if not catalog.should_translate(entry):
+            self.lbl_suggest.setText("Suggestion: -")
+        elif self.current_idx in self.suggestions:
+            self.lbl_suggest.setText(f"Suggestion: {self.suggestions[self.current_idx]}")
+        else:
+            self.lbl_suggest.setText("Suggestion: ...")
+
+    def saved_api_key(self):
+        # 审阅建议不弹窗，只使用已保存的 Key
+        if not os.path.exists(self.config_path):
+            return ""
+        try:
+            key, _ = read_api_key(self.config_path)
+        except Exception as e:
+            self.log(f"Config read error: {e}")
+            return ""
+        return key
+
+    def request_suggestions(self):
+        """
+        为当前选中行及其后 SUGGEST_PREFETCH 个待审阅行预取译文
+        """
+        if self.current_idx < 0: return
+        row = self.display_rows.get(self.current_idx)
+        if row is None: return
+
+        worker_running = self.worker is not None and self.worker.isRunning()
+        jobs = []
+        # 已在翻译队列中的行不重复请求，改为提升其优先级，避免与翻译线程叠加请求频率
+        queued = []
+        for table_row in range(row, self.left_table.rowCount()):
+            if len(jobs) + len(queued) > SUGGEST_PREFETCH:
+                break
+            item = self.left_table.item(table_row, 0)
+            if item is None: continue
+            idx = item.data(Qt.ItemDataRole.UserRole)
+            entry = self.po_entries[idx]
+            if idx in self.suggestions or not catalog.should_translate(entry):
+                continue
+            if worker_running and self.worker.is_pending(idx):
+                queued.append(idx)
+            else:
+                jobs.append((idx, catalog.source_text(entry)))
+
+        if queued:
+            self.worker.set_priority(PRIORITY_SELECTED, [self.current_idx] + queued)
+
+        if not jobs:
+            self.show_suggestion()
+            return
+
+        api_key = self.saved_api_key()
+        if not api_key:
+            self.lbl_suggest.setText("Suggestion: - (No saved API Key)")
+            return
+
+        # 取消过期请求，已发出的请求结果仍会写入缓存
+        for worker in self.suggest_workers:
+            worker.requestInterruption()
+
+        worker = SuggestionWorker(jobs, api_key, self)
+        worker.log_signal.connect(self.log)
+        worker.suggestion_ready.connect(self.on_suggestion_ready)
+        # 线程由父窗口持有，结束后再交给 Qt 延迟销毁
+        worker.finished.connect(lambda: self.suggest_workers.remove(worker))
+        worker.finished.connect(worker.deleteLater)
+        self.suggest_workers.append(worker)
+        worker.start()
+
+    def on_suggestion_ready(self, idx, text):
+        self.suggestions[idx] = text
+        if idx == self.current_idx:
+            self.show_suggestion()
+
     def action_accept(self):
         if self.current_idx < 0: return
         self.po_entries[self.current_idx]['status'] = 'Saved'
@@ -579,8 +949,15 @@ class MainWindow(QMainWindow):
         if self.current_idx < 0: return
         entry = self.po_entries[self.current_idx]
 
+        # 有预取的建议时直接填入 (与 AI 翻译相同的合并规则)
+        suggestion = self.suggestions.get(self.current_idx)
+        if suggestion is not None and catalog.should_translate(entry):
+            suggest_str, suggest_dict = catalog.merge_ai_result(entry, suggestion)
+        else:
+            suggest_str, suggest_dict = entry['translated_text'], entry['translated_plural']
+
         if entry['is_plural']:
-            current_dict = entry['translated_plural']
+            current_dict = suggest_dict
             # 如果字典为空，默认提供中文索引0
             if not current_dict:
                 edit_text = "[0]: "
@@ -612,7 +989,7 @@ class MainWindow(QMainWindow):
                 entry['status'] = 'Saved'
                 self.refresh_ui()
         else:
-            dlg = LargeInputDialog(self, "Edit Translation", "Content:", entry['translated_text'])
+            dlg = LargeInputDialog(self, "Edit Translation", "Content:", suggest_str)
             if dlg.exec():
                 text = dlg.textValue()
                 entry['translated_text'] = text
@@ -625,7 +1002,16 @@ class MainWindow(QMainWindow):
             entry['translated_plural'] = text_dict
         else:
             entry['translated_text'] = text_str
-        self.refresh_ui()
+
+        # 只更新对应单元格，不重建整个表格
+        row = self.display_rows.get(idx)
+        if row is not None:
+            color = self._status_color(entry['status'])
+            self._set_item(self.right_table, row, 1, self._trans_display(entry), color, idx)
+
+        # 选中行由翻译线程完成时 (未单独预取)，建议栏显示该结果
+        if idx == self.current_idx and idx not in self.suggestions:
+            self.lbl_suggest.setText(f"Suggestion: {self._trans_display(entry)}")
 
     def save_progress(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save Project", "progress.tmp", "Tmp (*.tmp)")
@@ -639,6 +1025,10 @@ class MainWindow(QMainWindow):
         if path:
             with open(path, 'rb') as f:
                 self.po_entries = pickle.load(f)
+            # 项目文件不记录原文路径，监视和导出需要重新选择
+            self.stop_watch()
+            self.new_ru_path = ""
+            self.suggestions = {}
             self.refresh_ui()
 
     def show_final_dialog(self):
@@ -647,47 +1037,13 @@ class MainWindow(QMainWindow):
             self.do_export()
 
     def do_export(self):
-        save_path, _ = QFileDialog.getSaveFileName(self, "Export NEW Translated MO", "global.mo", "MO Files (*.mo)")
+        default_name = os.path.basename(self.new_ru_path) if self.new_ru_path else "global.mo"
+        save_path, _ = QFileDialog.getSaveFileName(self, "Export NEW Translated MO", default_name, "MO Files (*.mo)")
         if not save_path: return
 
         try:
-            new_po = polib.POFile(wrapwidth=0)
-            new_po.metadata = {
-                'Project-Id-Version': 'Mir Korabley',
-                'Last-Translator': 'DDF_FantasyV',
-                'Language-Team': '<REPAD Localization Team>',
-                'Language': 'zh_SG',
-                'Content-Type': 'text/plain; charset=UTF-8',
-                'Content-Transfer-Encoding': '8bit',
-                'Plural-Forms': 'nplurals=1; plural=0;'
-            }
-
-            count = 0
-            for item in self.po_entries:
-                if item['status'] == 'Deleted': continue
-
-                if item['is_plural']:
-                    # 复数条目创建
-                    # 确保字典 key 是 int
-                    clean_plural_dict = {int(k): str(v) for k, v in item['translated_plural'].items()}
-
-                    entry = polib.POEntry(
-                        msgid=item['msgid'],
-                        msgid_plural=item['msgid_plural'],
-                        msgstr_plural=clean_plural_dict
-                    )
-                else:
-                    # 单数条目创建
-                    entry = polib.POEntry(
-                        msgid=item['msgid'],
-                        msgstr=item['translated_text']
-                    )
-
-                new_po.append(entry)
-                count += 1
-
-            new_po.save_as_mofile(save_path)
-            new_po.save(save_path.replace('.mo', '.po'))
+            project_id = catalog.read_project_id(self.new_ru_path) if os.path.exists(self.new_ru_path) else None
+            count = catalog.export_mo(self.po_entries, save_path, project_id)
 
             QMessageBox.information(self, "Completed", f"Export Completed！{count} Total.")
 
@@ -696,13 +1052,140 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", str(e))
 
     def closeEvent(self, event):
-        if hasattr(self, 'log_window'):
+        for worker in list(self.suggest_workers):
+            worker.requestInterruption()
+        for worker in list(self.suggest_workers):
+            worker.wait()
+        if self.log_window is not None:
             self.log_window.close()
         event.accept()
         QApplication.quit()
 
+def run_watch_headless(args):
+    """
+    无界面监视模式：轮询新版原文 MO，增量比对并翻译变化条目，结果写回项目文件
+    """
+    if os.path.exists(args.project):
+        with open(args.project, 'rb') as f:
+            po_entries = pickle.load(f)
+        print(f"Project Loaded: {len(po_entries)}")
+    else:
+        po_entries = catalog.load_new(args.watch)
+        if args.old_ru:
+            catalog.compare_old(po_entries, args.old_ru)
+        if args.old_cn:
+            catalog.load_translations(po_entries, args.old_cn)
+        with open(args.project, 'wb') as f:
+            pickle.dump(po_entries, f)
+        print(f"Project Created: {len(po_entries)}")
+
+    api_key = ""
+    config_path = os.path.join(get_base_path(), 'PoeditCopilot.ini')
+    if not args.no_translate and os.path.exists(config_path):
+        api_key, _ = read_api_key(config_path)
+    if not api_key:
+        print("No API Key, changed entries will not be translated.")
+
+    # 首次启动时同步一次，之后按修改时间和大小轮询
+    last_stat = None
+    print(f"Watch Mode Started: {args.watch}")
+    try:
+        while True:
+            try:
+                st = os.stat(args.watch)
+                cur_stat = (st.st_mtime, st.st_size)
+            except OSError:
+                cur_stat = None
+
+            if cur_stat is not None and cur_stat != last_stat:
+                last_stat = cur_stat
+                t0 = time.perf_counter()
+                try:
+                    changed = catalog.rediff(po_entries, args.watch)
+                except Exception as e:
+                    print(f"Watch Error: {e}")
+                    changed = None
+
+                if changed:
+                    print(f"{len(changed)} entries changed, re-diffed in {(time.perf_counter() - t0) * 1000:.0f} ms")
+                    if api_key:
+                        # 本地预筛，无需翻译的条目不请求 API
+                        resolved = set()
+                        for idx, trans_str, trans_dict in catalog.resolve_local(po_entries, changed):
+                            row = po_entries[idx]
+                            if row['is_plural']:
+                                row['translated_plural'] = trans_dict
+                            else:
+                                row['translated_text'] = trans_str
+                            resolved.add(idx)
+                        for idx in changed:
+                            row = po_entries[idx]
+                            if idx in resolved or not catalog.should_translate(row):
+                                continue
+                            trans_str, trans_dict = catalog.translate_row(row, api_key, print)
+                            if row['is_plural']:
+                                row['translated_plural'] = trans_dict
+                            else:
+                                row['translated_text'] = trans_str
+                            print(f"Translation [{row['entry_id']}]: {trans_str or trans_dict}")
+
+                    with open(args.project, 'wb') as f:
+                        pickle.dump(po_entries, f)
+                    print("Project Saved")
+
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("Watch Mode Stopped.")
+
+
+def run_batch_headless(args):
+    """
+    无界面批量模式：处理整个语言目录树并输出汇总报告
+    """
+    # 进程池相关模块只在批量模式导入，不拖慢界面启动
+    import batch
+
+    api_key = ""
+    config_path = os.path.join(get_base_path(), 'PoeditCopilot.ini')
+    if not args.no_translate and os.path.exists(config_path):
+        api_key, _ = read_api_key(config_path)
+    if not api_key:
+        print("No API Key, entries will not be translated.")
+
+    t0 = time.perf_counter()
+    report = batch.run_batch(args.batch, args.out, args.old_ru, args.old_cn,
+                             api_key=api_key, workers=args.workers)
+    print(batch.format_report(report))
+    print(f"Batch Completed in {time.perf_counter() - t0:.1f} s, report: {os.path.join(args.out, batch.REPORT_NAME)}")
+
+
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    # 打包后的程序需要支持进程池子进程启动
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Poedit Copilot")
+    parser.add_argument('--watch', metavar='NEW_MO', help="headless watch mode on the NEW Original MO")
+    parser.add_argument('--batch', metavar='NEW_DIR', help="headless batch mode on a NEW Original locale tree")
+    parser.add_argument('--project', default='progress.tmp', help="project file to update in watch mode")
+    parser.add_argument('--old-ru', help="OLD Original MO (watch) or locale tree (batch)")
+    parser.add_argument('--old-cn', help="OLD Translated MO (watch) or locale tree (batch)")
+    parser.add_argument('--out', default='output', help="output directory in batch mode")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size in batch mode")
+    parser.add_argument('--interval', type=float, default=5.0, help="polling interval in seconds")
+    parser.add_argument('--no-translate', action='store_true', help="skip AI translation")
+    args, qt_args = parser.parse_known_args()
+
+    if args.watch:
+        run_watch_headless(args)
+        sys.exit(0)
+
+    if args.batch:
+        run_batch_headless(args)
+        sys.exit(0)
+
+    app = QApplication(sys.argv[:1] + qt_args)
     window = MainWindow()
     window.showMaximized()
     app.lastWindowClosed.connect(app.quit)
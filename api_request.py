@@ -1,32 +1,80 @@
-from google import genai
 import time
 
+MODEL_NAME = "gemini-2.5-flash"
+
+# 客户端缓存 api_key -> genai.Client
+_clients = {}
+# 译文缓存 (text, source_lang, target_lang) -> 译文，重复文本只请求一次
+_translations = {}
+
+
+def get_client(api_key):
+    """
+    获取 (并缓存) Google Genai 客户端
+    SDK 在首次调用时才导入，避免拖慢程序启动
+    :param api_key: 用户的 API Key
+    :return: genai.Client
+    """
+    client = _clients.get(api_key)
+    if client is None:
+        from google import genai
+        client = genai.Client(api_key=api_key)
+        _clients[api_key] = client
+    return client
+
+
+def is_auth_error(error):
+    """
+    判断异常是否为 Key 被拒绝 (401/403/Key 无效)，网络等临时错误返回 False
+    """
+    text = str(error)
+    return (getattr(error, 'code', None) in (401, 403)
+            or 'API_KEY_INVALID' in text or 'API key not valid' in text)
+
 
 def validate_api_key(api_key):
     """
     验证 API Key 是否有效
-    :return: (bool, str) -> (是否成功, 错误信息/成功信息)
+    只读取模型元数据，不消耗生成请求
+    :return: (bool or None, str) -> (是否成功, 错误信息/成功信息)，None 表示网络等原因暂时无法验证
     """
     if not api_key or not api_key.strip():
         return False, "API Key cannot be empty"
 
     try:
         # 实例化客户端
-        client = genai.Client(api_key=api_key)
+        client = get_client(api_key)
 
-        # 发送一个极简的测试请求
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents="Hello"
-        )
+        # 查询模型元数据，Key 无效时会抛出异常
+        model = client.models.get(model=MODEL_NAME)
 
-        if response and response.text:
+        if model and model.name:
             return True, "API Key is valid"
         else:
             return False, "API Key is invalid"
 
     except Exception as e:
-        return False, f"Verify Error: {str(e)}"
+        _clients.pop(api_key, None)
+        if is_auth_error(e):
+            return False, f"Verify Error: {str(e)}"
+        return None, f"Verify Error: {str(e)}"
+
+
+def cached_translation(text, source_lang="Russian",
+                       target_lang="Simplified Chinese (for Game Localization)"):
+    """
+    查询译文缓存
+    :return: 已缓存的译文，没有时返回 None
+    """
+    return _translations.get((text, source_lang, target_lang))
+
+
+def forget_translation(text, source_lang="Russian",
+                       target_lang="Simplified Chinese (for Game Localization)"):
+    """
+    删除缓存的译文 (校验失败需要重新请求时使用)
+    """
+    _translations.pop((text, source_lang, target_lang), None)
 
 
 def translate_with_gemini(text, api_key, source_lang="Russian",
@@ -42,9 +90,14 @@ def translate_with_gemini(text, api_key, source_lang="Russian",
     if not text or not text.strip():
         return ""
 
+    cache_key = (text, source_lang, target_lang)
+    cached = _translations.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         # 使用传入的 api_key 实例化
-        client = genai.Client(api_key=api_key)
+        client = get_client(api_key)
     except Exception as e:
         return f"[Client Init Error] {str(e)}"
 
@@ -61,12 +114,14 @@ def translate_with_gemini(text, api_key, source_lang="Russian",
 
     try:
         response = client.models.generate_content(
-            model="gemini-2.5-flash",
+            model=MODEL_NAME,
             contents=prompt
         )
 
         if response.text:
-            return response.text.strip()
+            result = response.text.strip()
+            _translations[cache_key] = result
+            return result
         else:
             return "[API Error] Empty response"
 
@@ -0,0 +1,178 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import catalog
+import prefilter
+
+REPORT_NAME = 'batch_report.csv'
+REPORT_FIELDS = ['file', 'total', 'new', 'modified', 'deleted', 'translated', 'failed', 'exported', 'error']
+
+
+def pair_files(new_dir, old_ru_dir=None, old_cn_dir=None):
+    """
+    按相对路径配对新版原文、旧版原文、旧版译文 MO
+    :return: [(rel_path, new_path, old_ru_path or None, old_cn_path or None), ...]
+    """
+    jobs = []
+    for root, _, files in os.walk(new_dir):
+        for name in sorted(files):
+            if not name.lower().endswith('.mo'):
+                continue
+            new_path = os.path.join(root, name)
+            rel = os.path.relpath(new_path, new_dir)
+
+            old_ru = os.path.join(old_ru_dir, rel) if old_ru_dir else None
+            old_cn = os.path.join(old_cn_dir, rel) if old_cn_dir else None
+            if old_ru and not os.path.isfile(old_ru): old_ru = None
+            if old_cn and not os.path.isfile(old_cn): old_cn = None
+
+            jobs.append((rel, new_path, old_ru, old_cn))
+
+    jobs.sort()
+    return jobs
+
+
+def prepare_catalog(job):
+    """
+    进程池任务：读取并比对单个 catalog
+    :return: (rel_path, rows, project_id, error)
+    """
+    rel, new_path, old_ru, old_cn = job
+    try:
+        rows, metadata = catalog.load_new_with_metadata(new_path)
+        if old_ru:
+            catalog.compare_old(rows, old_ru)
+        if old_cn:
+            catalog.load_translations(rows, old_cn)
+        return rel, rows, metadata.get('Project-Id-Version', ''), ""
+    except Exception as e:
+        return rel, [], "", str(e)
+
+
+def export_catalog(job):
+    """
+    进程池任务：导出单个 catalog
+    :return: (rel_path, count, error)
+    """
+    rel, rows, project_id, save_path = job
+    try:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        return rel, catalog.export_mo(rows, save_path, project_id), ""
+    except Exception as e:
+        return rel, 0, str(e)
+
+
+def run_batch(new_dir, out_dir, old_ru_dir=None, old_cn_dir=None, api_key=None, workers=None, log=print):
+    """
+    批量处理整个语言目录树
+    解析、比对、导出分发到进程池；翻译在主进程共用一个队列和缓存，跨 catalog 的重复文本只翻译一次
+    :param new_dir: 新版原文目录
+    :param out_dir: 输出目录 (保持相对路径)
+    :param old_ru_dir: 旧版原文目录
+    :param old_cn_dir: 旧版译文目录
+    :param api_key: API Key，为空时跳过翻译
+    :param workers: 进程数，默认 CPU 数
+    :param log: 日志回调
+    :return: 每个文件的汇总列表
+    """
+    jobs = pair_files(new_dir, old_ru_dir, old_cn_dir)
+    log(f"Batch: {len(jobs)} catalogs found.")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        prepared = list(pool.map(prepare_catalog, jobs))
+
+        summary = {}
+        for rel, rows, _, error in prepared:
+            summary[rel] = {
+                'file': rel,
+                'total': len(rows),
+                'new': sum(1 for r in rows if r['status'] == 'New'),
+                'modified': sum(1 for r in rows if r['status'] == 'Modified'),
+                'deleted': sum(1 for r in rows if r['status'] == 'Deleted'),
+                'translated': 0,
+                'failed': 0,
+                'exported': 0,
+                'error': error
+            }
+            if error:
+                log(f"Batch Error [{rel}]: {error}")
+
+        if api_key:
+            # 共用翻译队列：原文 -> [(catalog 序号, 行索引), ...]
+            queue = {}
+            for c_idx, (_, rows, _, _) in enumerate(prepared):
+                for r_idx, row in enumerate(rows):
+                    if catalog.should_translate(row):
+                        queue.setdefault(catalog.source_text(row), []).append((c_idx, r_idx))
+
+            total_rows = sum(len(targets) for targets in queue.values())
+            texts = list(queue)
+            # 本地预筛，无需翻译的文本原样保留
+            local = {text for text, reason in zip(texts, prefilter.classify_batch(texts)) if reason is not None}
+            log(f"Batch: {total_rows} entries to translate, {len(queue)} unique, {len(local)} resolved locally.")
+
+            for n, (text, targets) in enumerate(queue.items(), 1):
+                if text in local:
+                    ai_result = text
+                else:
+                    ai_result = catalog.ai_translate_checked(text, api_key, log)
+
+                # 批量导出没有审阅环节：失败的行保留原有译文，只计数
+                if catalog.is_error_result(ai_result):
+                    for c_idx, _ in targets:
+                        summary[prepared[c_idx][0]]['failed'] += 1
+                    log(f"Batch Translation Failed [{n}/{len(queue)}] x{len(targets)}: {ai_result}")
+                    continue
+
+                # 审阅标记只在界面中使用，不写入导出文件
+                # 没有审阅环节，Modified 条目直接覆盖旧译文，不拼接
+                ai_result = catalog.strip_ai_mark(ai_result)
+                for c_idx, r_idx in targets:
+                    rel, rows, _, _ = prepared[c_idx]
+                    row = rows[r_idx]
+                    if row['is_plural']:
+                        row['translated_plural'] = dict(row['translated_plural'])
+                        row['translated_plural'][0] = ai_result
+                    else:
+                        row['translated_text'] = ai_result
+                    summary[rel]['translated'] += 1
+                if text not in local:
+                    log(f"Batch Translation [{n}/{len(queue)}] x{len(targets)}: {ai_result}")
+
+        export_jobs = [(rel, rows, project_id, os.path.join(out_dir, rel))
+                       for rel, rows, project_id, error in prepared if not error]
+        for rel, count, error in pool.map(export_catalog, export_jobs):
+            summary[rel]['exported'] = count
+            if error:
+                summary[rel]['error'] = error
+                log(f"Batch Export Error [{rel}]: {error}")
+
+    report = [summary[rel] for rel, _, _, _ in prepared]
+    write_report(report, os.path.join(out_dir, REPORT_NAME))
+    return report
+
+
+def write_report(report, path):
+    """
+    写出 CSV 汇总报告
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(report)
+
+
+def format_report(report):
+    """
+    生成汇总报告文本
+    """
+    lines = [f"{'File':<40} {'Total':>7} {'New':>6} {'Mod':>6} {'Del':>6} {'Trans':>6} {'Fail':>6} {'Export':>7}"]
+    for item in report:
+        line = (f"{item['file']:<40} {item['total']:>7} {item['new']:>6} {item['modified']:>6} "
+                f"{item['deleted']:>6} {item['translated']:>6} {item['failed']:>6} {item['exported']:>7}")
+        if item['error']:
+            line += f"  ERROR: {item['error']}"
+        lines.append(line)
+    return "\n".join(lines)
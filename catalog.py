@@ -0,0 +1,433 @@
+import hashlib
+import os
+import time
+import polib
+
+import api_request
+import prefilter
+
+# 占位符校验失败后的最大重试次数
+PLACEHOLDER_RETRIES = 2
+# 未审阅的 AI 译文标记
+AI_MARK = "[AI] "
+
+# 导出默认元数据，Project-Id-Version 可按源文件覆盖
+DEFAULT_METADATA = {
+    'Project-Id-Version': 'Mir Korabley',
+    'Last-Translator': 'DDF_FantasyV',
+    'Language-Team': '<REPAD Localization Team>',
+    'Language': 'zh_SG',
+    'Content-Type': 'text/plain; charset=UTF-8',
+    'Content-Transfer-Encoding': '8bit',
+    'Plural-Forms': 'nplurals=1; plural=0;'
+}
+
+
+def entry_source(entry):
+    """
+    获取 MO 条目的原文
+    :param entry: polib 条目
+    :return: 原文字符串 (复数取索引 0)
+    """
+    if entry.msgid_plural:
+        # 如果是复数，msgstr 为空，需要从 msgstr_plural 字典获取索引 0
+        return entry.msgstr_plural.get(0, "")
+    # 单数直接取 msgstr
+    return entry.msgstr
+
+
+def entry_hash(msgid_plural, text):
+    """
+    计算条目内容哈希，用于增量比对
+    :param msgid_plural: 复数 ID
+    :param text: 原文
+    :return: 十六进制哈希字符串
+    """
+    data = f"{msgid_plural}\x00{text}".encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def make_row(entry_id, entry):
+    """
+    根据 MO 条目创建数据行
+    :param entry_id: 条目编号 (从 1 开始)
+    :param entry: polib 条目
+    :return: dict
+    """
+    # 检测是否为复数
+    is_plural = bool(entry.msgid_plural)
+    new_ru_text = entry_source(entry)
+
+    return {
+        'entry_id': entry_id,
+        'msgid': entry.msgid,
+        'is_plural': is_plural,
+        'msgid_plural': entry.msgid_plural if is_plural else '',
+        'new_ru_text': new_ru_text,
+        'old_ru_text': '',
+        'status': 'New',
+        'translated_text': '',
+        'translated_plural': {},
+        'src_hash': entry_hash(entry.msgid_plural, new_ru_text)
+    }
+
+
+def load_new(path):
+    """
+    读取新版原文 MO
+    :param path: MO 文件路径
+    :return: 数据行列表
+    """
+    return load_new_with_metadata(path)[0]
+
+
+def load_new_with_metadata(path):
+    """
+    读取新版原文 MO，同时返回文件元数据 (只解析一次)
+    :param path: MO 文件路径
+    :return: (数据行列表, 元数据 dict)
+    """
+    mo = polib.mofile(path)
+    return [make_row(idx + 1, entry) for idx, entry in enumerate(mo)], mo.metadata
+
+
+def compare_old(rows, path):
+    """
+    与旧版原文 MO 比对，标记 New / Modified / Normal / Deleted
+    :param rows: 数据行列表 (原地修改)
+    :param path: 旧版原文 MO 文件路径
+    """
+    old_mo = polib.mofile(path)
+    # 建立旧版映射，映射整个 Entry 对象以检查复数ID
+    old_map = {e.msgid: e for e in old_mo}
+
+    new_ids = set()
+
+    for item in rows:
+        mid = item['msgid']
+        new_ids.add(mid)
+
+        if mid in old_map:
+            old_entry = old_map[mid]
+            if item['is_plural']:
+                item['old_ru_text'] = old_entry.msgstr_plural.get(0, "")
+            else:
+                item['old_ru_text'] = old_entry.msgstr
+
+            # 检查 msgid_plural 是否变更
+            plural_changed = False
+            if item['is_plural']:
+                if old_entry.msgid_plural != item['msgid_plural']:
+                    plural_changed = True
+
+            # 检查 msgstr 是否变更
+            text_changed = (item['new_ru_text'] != item['old_ru_text'])
+
+            if text_changed or plural_changed:
+                item['status'] = 'Modified'
+            else:
+                item['status'] = 'Normal'
+        else:
+            item['status'] = 'New'
+
+    # 处理删除
+    for entry in old_mo:
+        if entry.msgid not in new_ids:
+            rows.append({
+                'entry_id': -1,
+                'msgid': entry.msgid,
+                'is_plural': bool(entry.msgid_plural),
+                'msgid_plural': entry.msgid_plural,
+                'new_ru_text': '',
+                'old_ru_text': entry.msgstr,
+                'status': 'Deleted',
+                'translated_text': '',
+                'translated_plural': {}
+            })
+
+
+def load_translations(rows, path):
+    """
+    读取旧版译文 MO 并按 msgid 配对
+    :param rows: 数据行列表 (原地修改)
+    :param path: 旧版译文 MO 文件路径
+    :return: 配对数量
+    """
+    cn_mo = polib.mofile(path)
+    # 建立映射 msgid -> Entry对象
+    cn_map = {e.msgid: e for e in cn_mo}
+
+    count = 0
+    for item in rows:
+        if item['msgid'] in cn_map:
+            target_entry = cn_map[item['msgid']]
+
+            if item['is_plural']:
+                # 如果当前是复数，尝试获取目标文件的复数翻译
+                if target_entry.msgstr_plural:
+                    item['translated_plural'] = target_entry.msgstr_plural.copy()
+                # 兼容性处理
+                elif target_entry.msgstr:
+                    item['translated_plural'] = {0: target_entry.msgstr}
+            else:
+                # 单数
+                item['translated_text'] = target_entry.msgstr
+
+            count += 1
+
+    return count
+
+
+def rediff(rows, path):
+    """
+    新版原文 MO 更新后增量比对
+    只有内容哈希变化的条目会被重新标记，未变化条目 (包括 Saved) 保持不变
+    :param rows: 数据行列表 (原地修改，新增条目追加到末尾)
+    :param path: 新版原文 MO 文件路径
+    :return: 需要重新翻译的行索引列表
+    """
+    mo = polib.mofile(path)
+    row_map = {item['msgid']: idx for idx, item in enumerate(rows)}
+
+    changed = []
+    seen = set()
+
+    for pos, entry in enumerate(mo):
+        seen.add(entry.msgid)
+        text = entry_source(entry)
+        new_hash = entry_hash(entry.msgid_plural, text)
+        idx = row_map.get(entry.msgid)
+
+        if idx is None:
+            # 新增条目
+            rows.append(make_row(pos + 1, entry))
+            changed.append(len(rows) - 1)
+            continue
+
+        item = rows[idx]
+        item['entry_id'] = pos + 1
+        # 旧项目文件没有哈希，按当前原文补算
+        old_hash = item.get('src_hash') or entry_hash(item['msgid_plural'], item['new_ru_text'])
+        if old_hash == new_hash and item['status'] != 'Deleted':
+            item['src_hash'] = new_hash
+            continue
+
+        # 内容变化，旧原文取上一次快照
+        item['old_ru_text'] = item['new_ru_text'] or item['old_ru_text']
+        item['new_ru_text'] = text
+        item['is_plural'] = bool(entry.msgid_plural)
+        item['msgid_plural'] = entry.msgid_plural if item['is_plural'] else ''
+        item['src_hash'] = new_hash
+        item['status'] = 'Modified'
+        changed.append(idx)
+
+    # 处理删除
+    for item in rows:
+        if item['msgid'] not in seen and item['status'] != 'Deleted':
+            item['entry_id'] = -1
+            item['old_ru_text'] = item['new_ru_text']
+            item['new_ru_text'] = ''
+            item['status'] = 'Deleted'
+
+    return changed
+
+
+def should_translate(row):
+    """
+    判断是否需要 AI 翻译
+    翻译逻辑：New且空，或者 Modified
+    """
+    has_trans = row['translated_text'] or row['translated_plural']
+    return (row['status'] == 'New' and not has_trans) or (row['status'] == 'Modified')
+
+
+def source_text(row):
+    """
+    获取待翻译原文，原文为空时使用 msgid
+    """
+    original_text = row.get('new_ru_text', '')
+    if not original_text: original_text = row['msgid']
+    return original_text
+
+
+def ai_translate(text, api_key, log):
+    """
+    调用 AI 翻译单条文本
+    :param text: 原文
+    :param api_key: API Key
+    :param log: 日志回调
+    :return: 带 [AI] 标记的译文或错误信息
+    """
+    # 命中缓存无需请求，也无需限速等待
+    cached = api_request.cached_translation(text)
+    if cached is not None:
+        return f"{AI_MARK}{cached}"
+
+    try:
+        raw_result = api_request.translate_with_gemini(text, api_key)
+        if "Error" in raw_result:
+            ai_result = raw_result
+        else:
+            ai_result = f"{AI_MARK}{raw_result}"
+        time.sleep(1.0)
+
+    except Exception as e:
+        ai_result = f"Error: {str(e)}"
+        log(f"API Error: {str(e)}")
+
+    return ai_result
+
+
+def is_error_result(ai_result):
+    """
+    判断 AI 结果是否为错误信息 (请求错误或占位符校验失败)
+    """
+    return "Error" in ai_result
+
+
+def strip_ai_mark(ai_result):
+    """
+    去掉未审阅标记，得到纯译文
+    """
+    if ai_result.startswith(AI_MARK):
+        return ai_result[len(AI_MARK):]
+    return ai_result
+
+
+def check_ai_result(text, ai_result):
+    """
+    校验 AI 译文的占位符是否与原文一致，失败时清除缓存以便重新请求
+    :param text: 原文
+    :param ai_result: ai_translate 的返回值
+    :return: bool (请求错误不在此校验)
+    """
+    if is_error_result(ai_result) or prefilter.placeholder_parity(text, ai_result):
+        return True
+    api_request.forget_translation(text)
+    return False
+
+
+def ai_translate_checked(text, api_key, log):
+    """
+    调用 AI 翻译并校验占位符，失败时重试
+    :return: 译文，多次失败时带 [Placeholder Error] 标记
+    """
+    for _ in range(PLACEHOLDER_RETRIES + 1):
+        ai_result = ai_translate(text, api_key, log)
+        if check_ai_result(text, ai_result):
+            return ai_result
+        log(f"Placeholder mismatch, retrying: {ai_result}")
+    return f"[Placeholder Error] {ai_result}"
+
+
+def resolve_local(rows, indices):
+    """
+    批量预筛：无需翻译的条目 (空白、纯占位符/数字、标识符、链接、已是目标语言) 本地直接原样保留
+    :param rows: 数据行列表
+    :param indices: 待翻译行索引
+    :return: [(idx, trans_str, trans_dict), ...]
+    """
+    indices = [idx for idx in indices if should_translate(rows[idx])]
+    texts = [source_text(rows[idx]) for idx in indices]
+
+    resolved = []
+    for idx, text, reason in zip(indices, texts, prefilter.classify_batch(texts)):
+        if reason is not None:
+            trans_str, trans_dict = merge_ai_result(rows[idx], text)
+            resolved.append((idx, trans_str, trans_dict))
+    return resolved
+
+
+def translate_row(row, api_key, log):
+    """
+    翻译单行并与已有译文合并
+    :param row: 数据行
+    :param api_key: API Key
+    :param log: 日志回调
+    :return: (trans_str, trans_dict)
+    """
+    return merge_ai_result(row, ai_translate_checked(source_text(row), api_key, log))
+
+
+def merge_ai_result(row, ai_result):
+    """
+    将 AI 结果合并到已有译文 (Modified 条目追加到旧译文后)
+    :param row: 数据行
+    :param ai_result: AI 翻译结果
+    :return: (trans_str, trans_dict)
+    """
+    trans_str = ""
+    trans_dict = {}
+
+    if row['is_plural']:
+        old_text = row['translated_plural'].get(0, "")
+    else:
+        old_text = row['translated_text']
+
+    if row['status'] == 'Modified' and old_text:
+        if ai_result not in old_text:
+            final_text = f"{old_text}\n{ai_result}"
+        else:
+            final_text = old_text
+    else:
+        final_text = ai_result
+
+    # 复数逻辑
+    if row['is_plural']:
+        trans_dict = {0: final_text}
+    # 单数逻辑
+    else:
+        trans_str = final_text
+
+    return trans_str, trans_dict
+
+
+def read_project_id(path):
+    """
+    读取 MO 文件的 Project-Id-Version
+    :return: 字符串，不存在时为空
+    """
+    return polib.mofile(path).metadata.get('Project-Id-Version', '')
+
+
+def export_mo(rows, save_path, project_id=None):
+    """
+    导出新版译文 MO (同时生成 PO)
+    :param rows: 数据行列表
+    :param save_path: MO 保存路径
+    :param project_id: Project-Id-Version，为空时使用默认值
+    :return: 导出条目数量
+    """
+    new_po = polib.POFile(wrapwidth=0)
+    new_po.metadata = dict(DEFAULT_METADATA)
+    if project_id:
+        new_po.metadata['Project-Id-Version'] = project_id
+
+    count = 0
+    for item in rows:
+        if item['status'] == 'Deleted': continue
+
+        if item['is_plural']:
+            # 复数条目创建
+            # 确保字典 key 是 int
+            clean_plural_dict = {int(k): str(v) for k, v in item['translated_plural'].items()}
+
+            entry = polib.POEntry(
+                msgid=item['msgid'],
+                msgid_plural=item['msgid_plural'],
+                msgstr_plural=clean_plural_dict
+            )
+        else:
+            # 单数条目创建
+            entry = polib.POEntry(
+                msgid=item['msgid'],
+                msgstr=item['translated_text']
+            )
+
+        new_po.append(entry)
+        count += 1
+
+    new_po.save_as_mofile(save_path)
+    new_po.save(os.path.splitext(save_path)[0] + '.po')
+
+    return count
@@ -0,0 +1,104 @@
+import re
+from collections import Counter
+
+# 格式化占位符：%(points)s、%s、%.2f、{0}、{name}
+PLACEHOLDER = re.compile(
+    r'%\([^)]+\)[#0\-+]*\d*(?:\.\d+)?[diouxXeEfFgGcrsa]'
+    r'|%[#0\-+]*\d*(?:\.\d+)?[diouxXeEfFgGcrsa]'
+    r'|\{[^{}\s]*\}'
+)
+URL = re.compile(r'(?:https?|ftp)://\S+|www\.\S+|[\w.+\-]+@[\w\-]+\.[\w.\-]+')
+# 代码标识符：IDS_SHIP_NAME、ship.name、PCY001
+# 必须有代码特征 (下划线、点分路径、3 位以上字母数字混合)
+# OK、HP、N/A、km/h、HP/s、A/B、x2、F1 这类界面文本仍需翻译
+IDENTIFIER = re.compile(
+    r'[A-Za-z_][A-Za-z0-9_]*(?:[.:/\-][A-Za-z0-9_]+)*',
+    re.ASCII
+)
+IDENTIFIER_MARK = re.compile(
+    r'_'
+    r'|\w\.[A-Za-z_]'
+    r'|(?<![A-Za-z0-9])(?=[A-Za-z0-9]*[A-Za-z])(?=[A-Za-z0-9]*\d)[A-Za-z0-9]{3,}',
+    re.ASCII
+)
+LETTER = re.compile(r'[^\W\d_]')
+# 英文句子：两个以上字母组成的单词以空白相连
+ASCII_PROSE = re.compile(r'[A-Za-z]{2}\s+[A-Za-z]{2}')
+CYRILLIC = re.compile(r'[\u0400-\u04ff]')
+# 目标语言文字 (中文)
+TARGET_SCRIPT = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]')
+
+# 分类结果
+EMPTY = 'empty'
+PLACEHOLDER_ONLY = 'placeholder'
+URL_ONLY = 'url'
+IDENTIFIER_ONLY = 'identifier'
+TARGET_ONLY = 'target'
+
+
+def classify(text):
+    """
+    判断文本是否无需翻译
+    :param text: 原文
+    :return: 分类名称，需要翻译时返回 None
+    """
+    stripped = text.strip()
+    if not stripped:
+        return EMPTY
+
+    # 含源语言文字的直接判定为需要翻译 (绝大多数条目在这里返回)
+    if CYRILLIC.search(stripped):
+        return None
+
+    # 英文单词或句子不可能是占位符、链接、标识符或目标语言，直接返回
+    if stripped.isascii() and (stripped.isalpha() or ASCII_PROSE.search(stripped)):
+        return None
+
+    # 只在可能包含链接或占位符时才做替换
+    has_url = '://' in stripped or 'www.' in stripped or '@' in stripped
+    if has_url and URL.fullmatch(stripped):
+        return URL_ONLY
+
+    # 去掉占位符和链接后不含任何字母：纯占位符、数字、符号
+    rest = stripped
+    if '%' in rest or '{' in rest:
+        rest = PLACEHOLDER.sub('', rest)
+    if has_url:
+        rest = URL.sub('', rest)
+    if not LETTER.search(rest):
+        return PLACEHOLDER_ONLY
+
+    if IDENTIFIER.fullmatch(stripped) and IDENTIFIER_MARK.search(stripped):
+        return IDENTIFIER_ONLY
+
+    if TARGET_SCRIPT.search(stripped):
+        return TARGET_ONLY
+
+    return None
+
+
+def classify_batch(texts):
+    """
+    批量分类
+    :param texts: 原文列表
+    :return: 与 texts 等长的分类列表
+    """
+    return [classify(text) for text in texts]
+
+
+def placeholders(text):
+    """
+    提取占位符
+    :return: Counter
+    """
+    return Counter(PLACEHOLDER.findall(text))
+
+
+def placeholder_parity(source, result):
+    """
+    检查译文占位符是否与原文一致
+    :param source: 原文
+    :param result: 译文
+    :return: bool
+    """
+    return placeholders(source) == placeholders(result)